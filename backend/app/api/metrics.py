@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from app.core.singleflight import singleflight_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics/singleflight")
+def get_singleflight_metrics() -> dict:
+    """
+    Endpoint returning request coalescing counters per single-flight group.
+    """
+    return singleflight_stats()
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from app.api.auth import router as auth_router
 from app.api.chat import router as chat_router
+from app.api.metrics import router as metrics_router
 router = APIRouter()
 router.include_router(auth_router, prefix="/auth", tags=["Auth"])
-router.include_router(chat_router, tags=["Chat"])
\ No newline at end of file
+router.include_router(chat_router, tags=["Chat"])
+router.include_router(metrics_router, tags=["Metrics"])
\ No newline at end of file
@@ -1,9 +1,22 @@
+from typing import List
 from langchain_openai import AzureOpenAIEmbeddings
+from app.core.singleflight import SingleFlight, normalize
+from app.config.gateway import build_http_client, parse_deployments
 from app.config.load import (
     AZURE_OPENAI_EMBEDDINGS_API_KEY,
     AZURE_OPENAI_EMBEDDINGS_ENDPOINT,
     AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME,
     AZURE_OPENAI_API_VERSION,
+    AZURE_OPENAI_EMBEDDINGS_DEPLOYMENTS,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+)
+
+embedding_deployments = parse_deployments(
+    AZURE_OPENAI_EMBEDDINGS_DEPLOYMENTS,
+    endpoint=AZURE_OPENAI_EMBEDDINGS_ENDPOINT,
+    deployment=AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME,
+    api_key=AZURE_OPENAI_EMBEDDINGS_API_KEY,
 )
 
 embedding_model = AzureOpenAIEmbeddings(
@@ -11,4 +24,17 @@ embedding_model = AzureOpenAIEmbeddings(
     azure_endpoint=AZURE_OPENAI_EMBEDDINGS_ENDPOINT,
     deployment=AZURE_OPENAI_EMBEDDINGS_DEPLOYMENT_NAME,
     openai_api_version=AZURE_OPENAI_API_VERSION,
+    http_client=build_http_client(
+        embedding_deployments,
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+    ),
 )
+
+embedding_flight = SingleFlight("embed_query")
+
+
+def embed_query(text: str) -> List[float]:
+    """Embed a query, sharing the upstream call with identical concurrent queries."""
+    text = normalize(text)
+    return embedding_flight.do(text, lambda: embedding_model.embed_query(text))
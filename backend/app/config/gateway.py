@@ -0,0 +1,310 @@
+import json
+import logging
+import random
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+import httpx
+from app.config.load import GATEWAY_MAX_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+_DEPLOYMENT_PATH = re.compile(r"^.*?/openai/deployments/[^/]+(?P<rest>/.*)?$")
+_LATENCY_ALPHA = 0.2
+
+# One keep-alive pool shared by every model client in the process.
+shared_pool = httpx.HTTPTransport(
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=GATEWAY_MAX_CONNECTIONS,
+        max_keepalive_connections=GATEWAY_MAX_CONNECTIONS // 5 or 1,
+        keepalive_expiry=60.0,
+    ),
+    retries=1,
+)
+# Only hedged requests use worker threads: at most one primary plus one hedge
+# per pooled connection, so attempts never queue behind the executor.
+_executor = ThreadPoolExecutor(max_workers=2 * GATEWAY_MAX_CONNECTIONS, thread_name_prefix="llm-gateway")
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def _saturated() -> bool:
+    return _in_flight >= GATEWAY_MAX_CONNECTIONS
+
+
+@dataclass
+class Deployment:
+    """An Azure OpenAI deployment the gateway can route requests to."""
+    endpoint: str
+    deployment: str
+    api_key: str
+    weight: float = 1.0
+    failures: int = 0
+    unhealthy_until: float = 0.0
+    latency: Optional[float] = None  # EWMA of successful response times, in seconds
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+def parse_deployments(raw: Optional[str], endpoint: str, deployment: str, api_key: str) -> List[Deployment]:
+    """
+    Build the deployment list from a JSON env value.
+    Expects a list of objects with `endpoint`, `deployment`, `api_key` and an
+    optional `weight`; falls back to the single default deployment. A weight
+    of 0 keeps a deployment as failover-only standby.
+    """
+    if not raw:
+        return [Deployment(endpoint=endpoint, deployment=deployment, api_key=api_key)]
+    deployments = [
+        Deployment(
+            endpoint=item.get("endpoint", endpoint),
+            deployment=item.get("deployment", deployment),
+            api_key=item.get("api_key", api_key),
+            weight=float(item.get("weight", 1.0)),
+        )
+        for item in json.loads(raw)
+    ]
+    if not deployments:
+        raise ValueError("The deployment list is empty.")
+    if any(d.weight < 0 for d in deployments):
+        raise ValueError("Deployment weights must not be negative.")
+    if not any(d.weight > 0 for d in deployments):
+        raise ValueError("At least one deployment needs a weight above 0.")
+    return deployments
+
+
+def _is_stream(request: httpx.Request) -> bool:
+    if b'"stream"' not in request.content:
+        return False
+    try:
+        return bool(json.loads(request.content).get("stream"))
+    except (ValueError, AttributeError):
+        return False
+
+
+class GatewayTransport(httpx.BaseTransport):
+    """
+    httpx transport that spreads Azure OpenAI calls over several deployments.
+
+    Requests are routed by weight among healthy deployments, scaled by each
+    deployment's recent latency. Throttled (429), 5xx and connection
+    failures put a deployment in an exponential cooldown and the request
+    fails over to the next one.
+
+    If a non-streaming attempt is slower than the configured latency
+    percentile, one hedged copy is sent to another deployment and whichever
+    answers first wins. Hedged attempts are read in full so the loser can be
+    discarded. Streaming requests (`"stream": true`) are never hedged and are
+    passed through unbuffered on the caller's thread, as is every request
+    while hedging is off, still warming up or the connection pool is busy.
+    """
+
+    def __init__(
+        self,
+        deployments: List[Deployment],
+        transport: httpx.BaseTransport = shared_pool,
+        hedge_percentile: Optional[float] = 0.95,
+        hedge_min_samples: int = 20,
+        cooldown: float = 5.0,
+        max_cooldown: float = 120.0,
+    ):
+        if not deployments:
+            raise ValueError("At least one deployment is required.")
+        self.deployments = deployments
+        self.transport = transport
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._latencies: Deque[float] = deque(maxlen=512)
+        self._lock = threading.Lock()
+
+    def _pick(self, exclude: List[Deployment]) -> Optional[Deployment]:
+        candidates = [d for d in self.deployments if d not in exclude]
+        healthy = [d for d in candidates if d.healthy]
+        pool = healthy or candidates  # fail open when everything is cooling down
+        if not pool:
+            return None
+
+        known = [d.latency for d in pool if d.latency]
+        reference = statistics.fmean(known) if known else 1.0
+        weights = [d.weight * reference / (d.latency or reference) for d in pool]
+        if not any(weights):
+            return random.choice(pool)  # only standby deployments are left
+        return random.choices(pool, weights=weights)[0]
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile is None or len(self.deployments) < 2:
+            return None
+        samples = sorted(self._latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile))]
+
+    def _rewrite(self, request: httpx.Request, target: Deployment) -> httpx.Request:
+        # Endpoints may carry a base path (e.g. an APIM gateway at /aoai), so
+        # the Azure API path is re-rooted under the target's own base path.
+        base = httpx.URL(target.endpoint)
+        base_path = base.path.rstrip("/")
+        path = request.url.path
+        match = _DEPLOYMENT_PATH.match(path)
+        if match:
+            path = f"{base_path}/openai/deployments/{target.deployment}{match['rest'] or ''}"
+        elif "/openai/" in path:
+            path = base_path + path[path.index("/openai/"):]
+        url = request.url.copy_with(scheme=base.scheme, host=base.host, port=base.port, path=path)
+
+        headers = {k: v for k, v in request.headers.items() if k.lower() != "host"}
+        headers["api-key"] = target.api_key
+        return httpx.Request(request.method, url, headers=headers, content=request.content, extensions=request.extensions)
+
+    def _record_success(self, target: Deployment, latency: float) -> None:
+        with self._lock:
+            target.failures = 0
+            target.unhealthy_until = 0.0
+            if target.latency is None:
+                target.latency = latency
+            else:
+                target.latency += _LATENCY_ALPHA * (latency - target.latency)
+            self._latencies.append(latency)
+
+    def _record_failure(self, target: Deployment, retry_after: Optional[str] = None) -> None:
+        with self._lock:
+            target.failures += 1
+            cooldown = min(self.cooldown * 2 ** (target.failures - 1), self.max_cooldown)
+            if retry_after and retry_after.isdigit():
+                cooldown = max(cooldown, float(retry_after))
+            target.unhealthy_until = time.monotonic() + cooldown
+        logger.warning(f"Deployment '{target.deployment}' at {target.endpoint} unhealthy for {cooldown:.1f}s")
+
+    @staticmethod
+    def _retryable(response: httpx.Response) -> bool:
+        return response.status_code == 429 or response.status_code >= 500
+
+    def _send(self, request: httpx.Request, target: Deployment, read: bool) -> httpx.Response:
+        """
+        Send one attempt. Latency is measured to the response headers, which
+        for non-streaming completions arrive once the answer is ready.
+        """
+        global _in_flight
+        with _in_flight_lock:
+            _in_flight += 1
+        start = time.monotonic()
+        try:
+            response = self.transport.handle_request(self._rewrite(request, target))
+            latency = time.monotonic() - start
+            if self._retryable(response):
+                response.read()
+                self._record_failure(target, response.headers.get("retry-after"))
+                return response
+            if read:
+                response.read()
+        except httpx.TransportError:
+            self._record_failure(target)
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight -= 1
+
+        self._record_success(target, latency)
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        hedge_delay = None if _is_stream(request) else self._hedge_delay()
+        if hedge_delay is None or _saturated():
+            return self._handle_inline(request)
+        return self._handle_hedged(request, hedge_delay)
+
+    def _handle_inline(self, request: httpx.Request) -> httpx.Response:
+        tried: List[Deployment] = []
+        last_response: Optional[httpx.Response] = None
+        last_error: Optional[Exception] = None
+
+        target = self._pick(tried)
+        while target is not None:
+            tried.append(target)
+            try:
+                response = self._send(request, target, read=False)
+            except httpx.TransportError as e:
+                last_error = e
+            else:
+                if not self._retryable(response):
+                    return response
+                last_response = response
+            target = self._pick(tried)
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def _handle_hedged(self, request: httpx.Request, hedge_delay: float) -> httpx.Response:
+        tried: List[Deployment] = []
+        pending: Dict[Future, Deployment] = {}
+        last_response: Optional[httpx.Response] = None
+        last_error: Optional[Exception] = None
+        hedged = False
+
+        def submit(target: Deployment) -> None:
+            tried.append(target)
+            pending[_executor.submit(self._send, request, target, True)] = target
+
+        submit(self._pick(tried))
+
+        while pending:
+            # At most one hedge per request, failover attempts included.
+            done, _ = wait(pending, timeout=None if hedged else hedge_delay, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                target = self._pick(tried)
+                if target is not None and not _saturated():
+                    logger.debug(f"Hedging request to deployment '{target.deployment}'")
+                    submit(target)
+                continue
+
+            for future in done:
+                pending.pop(future)
+                try:
+                    response = future.result()
+                except httpx.TransportError as e:
+                    last_error = e
+                    continue
+                if not self._retryable(response):
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return response
+                last_response = response
+
+            if not pending:
+                target = self._pick(tried)
+                if target is not None:
+                    submit(target)
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def close(self) -> None:
+        # The pooled transport is shared; it is closed with the process.
+        pass
+
+
+def _close_response(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def build_http_client(deployments: List[Deployment], **kwargs) -> httpx.Client:
+    """Create an httpx client that routes through a gateway over the shared pool."""
+    return httpx.Client(
+        transport=GatewayTransport(deployments, **kwargs),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
@@ -1,9 +1,20 @@
 from langchain.chat_models import init_chat_model
+from app.config.gateway import build_http_client, parse_deployments
 from app.config.load import (
     AZURE_OPENAI_API_KEY,
     AZURE_OPENAI_ENDPOINT,
     AZURE_OPENAI_DEPLOYMENT_NAME,
     AZURE_OPENAI_API_VERSION,
+    AZURE_OPENAI_DEPLOYMENTS,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+)
+
+llm_deployments = parse_deployments(
+    AZURE_OPENAI_DEPLOYMENTS,
+    endpoint=AZURE_OPENAI_ENDPOINT,
+    deployment=AZURE_OPENAI_DEPLOYMENT_NAME,
+    api_key=AZURE_OPENAI_API_KEY,
 )
 
 llm_model = init_chat_model(
@@ -13,4 +24,9 @@ llm_model = init_chat_model(
     azure_endpoint=AZURE_OPENAI_ENDPOINT,
     openai_api_version=AZURE_OPENAI_API_VERSION,
     temperature=0,
+    http_client=build_http_client(
+        llm_deployments,
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+    ),
 )
@@ -13,3 +13,30 @@ AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")
 
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+
+# Near-duplicate filtering at ingest: "skip", "merge" or "off".
+# Off by default: a near-duplicate match can also be an edited revision of a
+# chunk (see the precision table in app/tools/rag/dedup.py), which would be dropped.
+DEDUP_POLICY = os.getenv("DEDUP_POLICY", "off")
+if DEDUP_POLICY not in ("skip", "merge", "off"):
+    raise ValueError(f"Invalid DEDUP_POLICY '{DEDUP_POLICY}', expected 'skip', 'merge' or 'off'.")
+# Max SimHash bit distance still treated as a near-duplicate (out of 64).
+# Higher values catch more boilerplate but drop more edited chunks.
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "4"))
+
+# Multi-tenant storage: logical collections share a few physical Qdrant collections
+QDRANT_MULTITENANT = os.getenv("QDRANT_MULTITENANT", "false").lower() == "true"
+QDRANT_PHYSICAL_COLLECTIONS = int(os.getenv("QDRANT_PHYSICAL_COLLECTIONS", "1"))
+if QDRANT_PHYSICAL_COLLECTIONS < 1:
+    raise ValueError(f"Invalid QDRANT_PHYSICAL_COLLECTIONS '{QDRANT_PHYSICAL_COLLECTIONS}', expected 1 or more.")
+QDRANT_PHYSICAL_PREFIX = os.getenv("QDRANT_PHYSICAL_PREFIX", "docs")
+QDRANT_VECTOR_SIZE = int(os.getenv("QDRANT_VECTOR_SIZE", "1536"))
+
+# Model gateway: JSON lists of {"endpoint", "deployment", "api_key", "weight"}
+AZURE_OPENAI_DEPLOYMENTS = os.getenv("AZURE_OPENAI_DEPLOYMENTS")
+AZURE_OPENAI_EMBEDDINGS_DEPLOYMENTS = os.getenv("AZURE_OPENAI_EMBEDDINGS_DEPLOYMENTS")
+# Latency percentile after which a hedged copy is sent; "off" disables hedging
+_hedge_percentile = os.getenv("LLM_HEDGE_PERCENTILE", "0.95")
+LLM_HEDGE_PERCENTILE = None if _hedge_percentile.lower() == "off" else float(_hedge_percentile)
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+GATEWAY_MAX_CONNECTIONS = int(os.getenv("GATEWAY_MAX_CONNECTIONS", "100"))
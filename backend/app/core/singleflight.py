@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_flights: Dict[str, "SingleFlight"] = {}
+
+
+def normalize(text: str) -> str:
+    """
+    Collapse whitespace so trivially different inputs share a flight key.
+    Case is kept: embeddings are case-sensitive, so "US" and "us" differ.
+    """
+    return " ".join(text.split())
+
+
+class CoalescedCallError(Exception):
+    """Raised in waiting callers when the shared in-flight call failed."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one upstream call.
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result. If the call fails, the first
+    caller gets the original exception and each waiter gets a fresh
+    CoalescedCallError chained from it. Nothing is cached once the call
+    finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        _flights[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise CoalescedCallError(f"Shared call for {key!r} failed: {call.error}") from call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+                "coalescing_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            }
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    """Coalescing metrics for every single-flight group."""
+    return {name: flight.stats() for name, flight in _flights.items()}
@@ -1,9 +1,13 @@
 import logging, sys
 from uuid import uuid4
 from langchain.tools import tool, StructuredTool
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set
+from qdrant_client import models
 from app.config.qdrant import qdrant_client
 from app.config.embeddings import embedding_model
+from app.config.load import DEDUP_POLICY, DEDUP_MAX_DISTANCE, QDRANT_MULTITENANT
+from app.tools.rag.dedup import NearDuplicateIndex, simhash, get_index
+from app.tools.rag.tenancy import ensure_collection, physical_collection, tenant_payload
 from app.core.schema import AddDocumentsArgs
 logger = logging.getLogger(__name__)
 
@@ -33,24 +37,120 @@ def add_documents_to_collection(
         return {"error": "No documents to add."}
 
     logger.info(f"Adding {len(documents)} documents to collection: {collection_name}")
-    
+
+    physical = physical_collection(collection_name)
+    merge = DEDUP_POLICY == "merge"
+    index = None
+    owned: Set[str] = set()
+    new_points: List[Dict[str, Any]] = []
+    matches: Dict[str, int] = {}
+    upserted = False
+
     try:
-        vectors = embedding_model.embed_documents(documents)  # Batch embeddings
-        points = [
-            {"id": str(uuid4()), "vector": vec, "payload": {"text": doc}}
-            for doc, vec in zip(documents, vectors)
-        ]
+        if QDRANT_MULTITENANT:
+            ensure_collection(collection_name)
+        if DEDUP_POLICY != "off":
+            index = get_index(collection_name, DEDUP_MAX_DISTANCE)
+
+        for doc in documents:
+            signature = simhash(doc)
+            point_id = str(uuid4())
+            match = index.claim(point_id, signature, owned, merge=merge) if index is not None else None
+            if match is not None:
+                matches[match] = matches.get(match, 0) + 1
+                continue
+            owned.add(point_id)
+            new_points.append({"id": point_id, "text": doc, "simhash": f"{signature:016x}"})
+
+        # Reservations stay pending while embedding and upserting, so concurrent
+        # ingests wait for them instead of skipping chunks that may never land.
+        if new_points:
+            vectors = embedding_model.embed_documents([p["text"] for p in new_points])  # Batch embeddings
+            points = [
+                {
+                    "id": p["id"],
+                    "vector": vec,
+                    "payload": {
+                        "text": p["text"],
+                        "simhash": p["simhash"],
+                        "duplicates": _duplicate_count(index, p["id"]),
+                        **tenant_payload(collection_name),
+                    },
+                }
+                for p, vec in zip(new_points, vectors)
+            ]
+            qdrant_client.upsert(
+                collection_name=physical,
+                points=points
+            )
+        upserted = True
+
+        warning = None
+        existing = [point_id for point_id in matches if point_id not in owned] if merge else []
+        if existing:
+            try:
+                qdrant_client.batch_update_points(
+                    collection_name=physical,
+                    update_operations=[
+                        models.SetPayloadOperation(
+                            set_payload=models.SetPayload(
+                                payload={"duplicates": _duplicate_count(index, point_id)},
+                                points=[point_id],
+                            )
+                        )
+                        for point_id in existing
+                    ],
+                )
+            except Exception as e:
+                logger.error(f"Error updating duplicate counts: {e}")
+                _undo_merges(index, matches, owned)
+                warning = f"Documents were added but duplicate counts were not updated: {e}"
+
+        skipped = len(documents) - len(new_points)
+        action = "merged" if merge else "skipped"
+        dedup = {
+            "total": len(documents),
+            "added": len(new_points),
+            "near_duplicates": skipped,
+            "dedup_ratio": round(skipped / len(documents), 4),
+            "policy": DEDUP_POLICY,
+        }
+        logger.info(f"Dedup for '{collection_name}': {dedup}")
+        result = {
+            "result": f"{len(new_points)} documents added to '{collection_name}' ({skipped} near-duplicates {action}).",
+            "dedup": dedup,
+        }
+        if warning:
+            result["warning"] = warning
+        return result
 
-        qdrant_client.upsert(
-            collection_name=collection_name,
-            points=points
-        )
-        return {"result": f"{len(points)} documents added to '{collection_name}'."}
-    
     except Exception as e:
         logger.error(f"Error adding documents: {e}")
+        if merge and not upserted:
+            _undo_merges(index, matches, owned)
         return {"error": str(e)}
 
+    finally:
+        if index is not None:
+            index.release(owned, persisted=upserted)
+
+
+def _duplicate_count(index: Optional[NearDuplicateIndex], point_id: str) -> int:
+    if index is None:
+        return 0
+    with index.lock:
+        return index.duplicates.get(point_id, 0)
+
+
+def _undo_merges(index: Optional[NearDuplicateIndex], matches: Dict[str, int], owned: Set[str]) -> None:
+    """Revert in-memory merge counts that were not persisted."""
+    if index is None:
+        return
+    with index.lock:
+        for point_id, count in matches.items():
+            if point_id not in owned and point_id in index.duplicates:
+                index.duplicates[point_id] -= count
+
 
 add_documents_tool = StructuredTool(
     name="add_documents_to_collection",
@@ -2,6 +2,8 @@ import logging, sys
 from langchain.tools import tool, Tool
 from typing import Dict, Any
 from app.config.qdrant import qdrant_client
+from app.config.load import QDRANT_MULTITENANT
+from app.tools.rag.tenancy import ensure_collection
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,10 @@ def create_collection(collection_name: str) -> Dict[str, Any]:
     logger.info(f"Creating collection: {collection_name}")
     
     try:
-        qdrant_client.create_collection(collection_name=collection_name)
+        if QDRANT_MULTITENANT:
+            ensure_collection(collection_name)
+        else:
+            qdrant_client.create_collection(collection_name=collection_name)
         return {"result": f"Collection '{collection_name}' created successfully."}
     except Exception as e:
         logger.error(f"Error creating collection: {e}")
@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from app.config.qdrant import qdrant_client
+from app.tools.rag.tenancy import physical_collection, tenant_filter
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_BITS = 64
+# Word bigrams. Measured on license/README text, bits of distance trade
+# recall on repeated boilerplate against dropping chunks that were edited:
+#
+#   threshold | one word changed (20/50/150/400 words) | 5% of words changed (150/400)
+#   4 bits    | 5% / 44% / 86% / 99% caught            | 9% / 14% wrongly dropped
+#   10 bits   | 71% / 98% / 100% / 100% caught         | 84% / 89% wrongly dropped
+#
+# Unrelated chunks sit 17+ bits apart. Short near-identical lines cannot be
+# caught without also merging edited revisions of longer chunks.
+SHINGLE_SIZE = 2
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash signature of a text chunk.
+    Features are word shingles, so chunks that share most of their wording
+    end up a few bits apart even if whitespace or small edits differ.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        features = words
+    else:
+        features = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    weights = [0] * SIGNATURE_BITS
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIGNATURE_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature
+
+
+class NearDuplicateIndex:
+    """
+    In-memory LSH index of SimHash signatures for one collection.
+    Signatures are split into `max_distance + 1` bands, so by pigeonhole any
+    signature within `max_distance` bits shares at least one band with a match.
+
+    Points being ingested are reserved in `pending` until they are persisted
+    or rolled back; other ingests wait on them rather than matching a point
+    that may never be stored.
+    """
+
+    def __init__(self, max_distance: int = 4):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-SIGNATURE_BITS // self.bands)
+        self.signatures: Dict[str, int] = {}
+        self.duplicates: Dict[str, int] = {}
+        self.pending: Dict[str, threading.Event] = {}
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self.lock = threading.Lock()
+
+    def _band_keys(self, signature: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [(band, signature >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def find(self, signature: int) -> Optional[str]:
+        """Return the point id of a stored near-duplicate, if any."""
+        for key in self._band_keys(signature):
+            for point_id in self._buckets.get(key, ()):
+                if (self.signatures[point_id] ^ signature).bit_count() <= self.max_distance:
+                    return point_id
+        return None
+
+    def add(self, point_id: str, signature: int, duplicates: int = 0) -> None:
+        self.signatures[point_id] = signature
+        self.duplicates[point_id] = duplicates
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(point_id)
+
+    def claim(self, point_id: str, signature: int, owned: Set[str], merge: bool = False) -> Optional[str]:
+        """
+        Reserve `signature` for a new point unless a near-duplicate exists.
+        Returns the matching point id, or None once the new point is reserved.
+        Matches pending in another ingest are waited on and re-checked;
+        matches in `owned` (the caller's own batch) are returned directly.
+        With `merge`, the match's duplicate count is incremented.
+        """
+        while True:
+            with self.lock:
+                match = self.find(signature)
+                if match is None:
+                    self.add(point_id, signature)
+                    self.pending[point_id] = threading.Event()
+                    return None
+                pending = self.pending.get(match)
+                if pending is None or match in owned:
+                    if merge:
+                        self.duplicates[match] += 1
+                    return match
+            pending.wait()
+
+    def release(self, point_ids: Set[str], persisted: bool) -> None:
+        """Settle reservations, dropping them if they were not persisted."""
+        with self.lock:
+            for point_id in point_ids:
+                if not persisted:
+                    self.remove(point_id)
+                event = self.pending.pop(point_id, None)
+                if event is not None:
+                    event.set()
+
+    def remove(self, point_id: str) -> None:
+        signature = self.signatures.pop(point_id, None)
+        self.duplicates.pop(point_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(point_id)
+
+
+_indexes: Dict[str, NearDuplicateIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _load_index(collection_name: str, max_distance: int) -> NearDuplicateIndex:
+    """
+    Rebuild a collection's index from the signatures persisted in its payloads.
+    Points ingested before signatures were stored are hashed from their text.
+    A missing collection yields an empty index; any other error propagates.
+    """
+    index = NearDuplicateIndex(max_distance=max_distance)
+    physical = physical_collection(collection_name)
+    if not qdrant_client.collection_exists(physical):
+        return index
+
+    unsigned: List[str] = []
+    offset = None
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=physical,
+            scroll_filter=tenant_filter(collection_name),
+            limit=256,
+            offset=offset,
+            with_payload=["simhash", "duplicates"],
+            with_vectors=False,
+        )
+        for record in records:
+            payload = record.payload or {}
+            if "simhash" in payload:
+                index.add(str(record.id), int(payload["simhash"], 16), payload.get("duplicates", 0))
+            else:
+                unsigned.append(str(record.id))
+        if offset is None:
+            break
+
+    for start in range(0, len(unsigned), 256):
+        records = qdrant_client.retrieve(
+            collection_name=physical,
+            ids=unsigned[start:start + 256],
+            with_payload=["text", "duplicates"],
+            with_vectors=False,
+        )
+        for record in records:
+            payload = record.payload or {}
+            index.add(str(record.id), simhash(payload.get("text", "")), payload.get("duplicates", 0))
+
+    logger.info(f"Dedup index for '{collection_name}' loaded with {len(index.signatures)} signatures.")
+    return index
+
+
+def get_index(collection_name: str, max_distance: int = 4) -> NearDuplicateIndex:
+    """
+    Return the cached index for a collection, loading it on first use.
+    Loading happens outside the registry lock so other collections keep
+    ingesting; a failed load is not cached and is retried next time.
+    """
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+    if index is not None:
+        return index
+
+    index = _load_index(collection_name, max_distance)
+    with _indexes_lock:
+        return _indexes.setdefault(collection_name, index)
+
+
+def drop_index(collection_name: str) -> None:
+    """Forget a cached index so it is rebuilt from Qdrant on next use."""
+    with _indexes_lock:
+        _indexes.pop(collection_name, None)
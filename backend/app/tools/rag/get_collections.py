@@ -2,6 +2,8 @@ import logging, sys
 from langchain.tools import Tool, tool
 from typing import List
 from app.config.qdrant import qdrant_client
+from app.config.load import QDRANT_MULTITENANT
+from app.tools.rag.tenancy import list_collections
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +15,10 @@ def get_collections() -> List[str]:
     Returns:
         List[str]: A list of collection names.
     """
+    collections = None
     try:
+        if QDRANT_MULTITENANT:
+            return list_collections()
         collections = qdrant_client.get_collections() #returns a tuple 
         return [collection.name for collection in collections.collections]  # Assuming collections[0] is the response object
     except Exception as e:
@@ -3,15 +3,21 @@ from langchain.tools import StructuredTool
 from typing import Dict, Any, List
 from app.config.qdrant import qdrant_client 
 from app.core.schema import RAGQueryInput, RagSearchArgs
-from app.config.embeddings import embedding_model
+from app.config.embeddings import embedding_model, embed_query
+from app.core.singleflight import SingleFlight, normalize
+from app.tools.rag.tenancy import physical_collection, tenant_filter
 from langchain_core.messages import ToolMessage
 
 logger = logging.getLogger(__name__)
 
+search_flight = SingleFlight("rag_search")
+
+
 def rag_qdrant_search(query: str, collection: str, top_k : int = 5) -> ToolMessage:
 
     """
     Perform a RAG-based search using Qdrant vector search.
+    Identical concurrent searches on the same collection share one upstream call.
     Args:
         params (RAGQueryInput): Input parameters for the search, including the query, collection name, and top_k results to return.
         
@@ -19,13 +25,19 @@ def rag_qdrant_search(query: str, collection: str, top_k : int = 5) -> ToolMessa
     logger.info(f"Received RAG query: {query} with top_k={top_k}")
     logger.debug(f"Type of query: {type(query)}, value: {query}")
 
-    query_vector = embedding_model.embed_query(query)
+    query = normalize(query)
+    return search_flight.do((collection, top_k, query), lambda: _search(query, collection, top_k))
+
+
+def _search(query: str, collection: str, top_k: int) -> str:
+    query_vector = embed_query(query)
 
     logger.debug(f"Query vector generated: {query_vector[:5]}... (truncated for brevity)")
     
     results = qdrant_client.search(
-        collection_name=collection,
+        collection_name=physical_collection(collection),
         query_vector=query_vector,
+        query_filter=tenant_filter(collection),
         limit=top_k,
         with_payload=True
     )
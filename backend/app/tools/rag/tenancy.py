@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set
+from uuid import NAMESPACE_URL, uuid5
+from qdrant_client import models
+from app.config.qdrant import qdrant_client
+from app.config.load import (
+    QDRANT_MULTITENANT,
+    QDRANT_PHYSICAL_COLLECTIONS,
+    QDRANT_PHYSICAL_PREFIX,
+    QDRANT_VECTOR_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+TENANT_KEY = "tenant"
+REGISTRY_COLLECTION = f"{QDRANT_PHYSICAL_PREFIX}_registry"
+
+_ensured_physical: Set[str] = set()
+_registered: Set[str] = set()
+_resolved: Dict[str, str] = {}
+_unregistered: Dict[str, float] = {}  # name -> monotonic time the registry miss expires
+_lock = threading.Lock()
+
+# How long a registry miss is trusted before asking Qdrant again.
+REGISTRY_MISS_TTL = 60.0
+
+
+def _registry_id(collection_name: str) -> str:
+    return str(uuid5(NAMESPACE_URL, collection_name))
+
+
+def physical_collection(collection_name: str) -> str:
+    """
+    Map a logical collection onto the physical Qdrant collection storing it.
+    Registered collections keep the shard recorded in the registry, so
+    changing QDRANT_PHYSICAL_COLLECTIONS only affects new collections.
+    Registry misses are cached for REGISTRY_MISS_TTL seconds.
+    """
+    if not QDRANT_MULTITENANT:
+        return collection_name
+    physical = _resolved.get(collection_name)
+    if physical is not None:
+        return physical
+
+    shard = zlib.crc32(collection_name.encode()) % QDRANT_PHYSICAL_COLLECTIONS
+    hashed = f"{QDRANT_PHYSICAL_PREFIX}_{shard}"
+    if _unregistered.get(collection_name, 0.0) > time.monotonic():
+        return hashed
+
+    if qdrant_client.collection_exists(REGISTRY_COLLECTION):
+        records = qdrant_client.retrieve(
+            collection_name=REGISTRY_COLLECTION,
+            ids=[_registry_id(collection_name)],
+            with_payload=["physical"],
+        )
+        if records:
+            physical = records[0].payload["physical"]
+            _resolved[collection_name] = physical
+            return physical
+
+    _unregistered[collection_name] = time.monotonic() + REGISTRY_MISS_TTL
+    return hashed
+
+
+def tenant_filter(collection_name: str) -> Optional[models.Filter]:
+    """Filter restricting a query to the points of one logical collection."""
+    if not QDRANT_MULTITENANT:
+        return None
+    return models.Filter(
+        must=[models.FieldCondition(key=TENANT_KEY, match=models.MatchValue(value=collection_name))]
+    )
+
+
+def tenant_payload(collection_name: str) -> Dict[str, str]:
+    """Payload fields tagging a point with its logical collection."""
+    return {TENANT_KEY: collection_name} if QDRANT_MULTITENANT else {}
+
+
+def _ensure_physical(physical: str) -> None:
+    if physical in _ensured_physical:
+        return
+    if not qdrant_client.collection_exists(physical):
+        logger.info(f"Creating physical collection: {physical}")
+        qdrant_client.create_collection(
+            collection_name=physical,
+            vectors_config=models.VectorParams(size=QDRANT_VECTOR_SIZE, distance=models.Distance.COSINE),
+            # Build HNSW links per tenant only; no global graph across doc sets.
+            hnsw_config=models.HnswConfigDiff(payload_m=16, m=0),
+        )
+        qdrant_client.create_payload_index(
+            collection_name=physical,
+            field_name=TENANT_KEY,
+            field_schema=models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True),
+        )
+    _ensured_physical.add(physical)
+
+
+def ensure_collection(collection_name: str) -> None:
+    """
+    Make sure a logical collection can receive points.
+    Creates the backing physical collection if needed and records the
+    logical name in the registry so it shows up in `list_collections`.
+    """
+    with _lock:
+        if collection_name in _registered:
+            return
+        physical = physical_collection(collection_name)
+        _ensure_physical(physical)
+        if not qdrant_client.collection_exists(REGISTRY_COLLECTION):
+            qdrant_client.create_collection(
+                collection_name=REGISTRY_COLLECTION,
+                vectors_config=models.VectorParams(size=1, distance=models.Distance.DOT),
+            )
+        qdrant_client.upsert(
+            collection_name=REGISTRY_COLLECTION,
+            points=[
+                models.PointStruct(
+                    id=_registry_id(collection_name),
+                    vector=[0.0],
+                    payload={"name": collection_name, "physical": physical},
+                )
+            ],
+        )
+        _registered.add(collection_name)
+        _resolved[collection_name] = physical
+        _unregistered.pop(collection_name, None)
+
+
+def list_collections() -> List[str]:
+    """List the logical collection names stored in the registry."""
+    if not qdrant_client.collection_exists(REGISTRY_COLLECTION):
+        return []
+    names: List[str] = []
+    offset = None
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=REGISTRY_COLLECTION,
+            limit=256,
+            offset=offset,
+            with_payload=["name"],
+            with_vectors=False,
+        )
+        names.extend(record.payload["name"] for record in records)
+        if offset is None:
+            break
+    return sorted(names)
+
+
+def migrate_collection(collection_name: str, batch_size: int = 256) -> int:
+    """
+    Copy a standalone collection into the shared multi-tenant layout.
+    Points are tagged with the tenant key and get ids derived from the
+    source collection and point id, so re-running is idempotent. The
+    source collection is left in place; drop it once the copy is checked.
+    Returns the number of points copied.
+    """
+    if not QDRANT_MULTITENANT:
+        raise ValueError("Multi-tenant mode is disabled; set QDRANT_MULTITENANT=true to migrate.")
+
+    ensure_collection(collection_name)
+    physical = physical_collection(collection_name)
+    copied = 0
+    offset = None
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            qdrant_client.upsert(
+                collection_name=physical,
+                points=[
+                    models.PointStruct(
+                        id=str(uuid5(NAMESPACE_URL, f"{collection_name}/{record.id}")),
+                        vector=record.vector,
+                        payload={**(record.payload or {}), TENANT_KEY: collection_name},
+                    )
+                    for record in records
+                ],
+            )
+            copied += len(records)
+        if offset is None:
+            break
+
+    # Imported here: the dedup module depends on this one for name mapping.
+    from app.tools.rag.dedup import drop_index
+    drop_index(collection_name)  # the cached index predates the copied points
+
+    logger.info(f"Migrated {copied} points from '{collection_name}' into '{physical}'.")
+    return copied
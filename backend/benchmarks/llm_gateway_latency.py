@@ -0,0 +1,98 @@
+"""
+Latency-injection benchmark for the model gateway.
+
+Starts two local stub "deployments" that answer like Azure OpenAI chat
+completions. Each request has a small chance of a long stall, which is what
+a throttled or overloaded regional deployment looks like from the client.
+The same workload is sent through a plain pooled client pinned to one
+deployment and through the gateway with hedging across both.
+
+Run from the backend folder:
+    python -m benchmarks.llm_gateway_latency
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+import httpx
+from app.config.gateway import Deployment, GatewayTransport
+
+RESPONSE = json.dumps({
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+}).encode()
+
+
+def start_stub(base_latency: float, slow_latency: float, slow_ratio: float) -> Tuple[ThreadingHTTPServer, str]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("content-length", 0)))
+            time.sleep(slow_latency if random.random() < slow_ratio else base_latency)
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(RESPONSE)))
+            self.end_headers()
+            self.wfile.write(RESPONSE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run(client: httpx.Client, url: str, requests: int, concurrency: int) -> List[float]:
+    def one(_):
+        start = time.perf_counter()
+        client.post(url, json={"messages": [{"role": "user", "content": "hi"}]}).raise_for_status()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(requests)))
+
+
+def report(name: str, latencies: List[float]) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    print(f"{name:<10} p50={q[49] * 1000:7.1f}ms  p95={q[94] * 1000:7.1f}ms  p99={q[98] * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-ms", type=float, default=20.0)
+    parser.add_argument("--slow-ms", type=float, default=800.0)
+    parser.add_argument("--slow-ratio", type=float, default=0.03)
+    args = parser.parse_args()
+
+    stubs = [start_stub(args.base_ms / 1000, args.slow_ms / 1000, args.slow_ratio) for _ in range(2)]
+    path = "/openai/deployments/gpt-4o-mini/chat/completions?api-version=2024-06-01"
+    primary = stubs[0][1]
+
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    with httpx.Client(transport=httpx.HTTPTransport(limits=limits)) as client:
+        report("direct", run(client, primary + path, args.requests, args.concurrency))
+
+    deployments = [Deployment(endpoint=url, deployment="gpt-4o-mini", api_key="stub") for _, url in stubs]
+    gateway = GatewayTransport(deployments, transport=httpx.HTTPTransport(limits=limits), hedge_percentile=0.9)
+    with httpx.Client(transport=gateway) as client:
+        run(client, primary + path, 50, args.concurrency)  # warm up the latency window
+        report("gateway", run(client, primary + path, args.requests, args.concurrency))
+
+    for server, _ in stubs:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
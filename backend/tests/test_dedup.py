@@ -0,0 +1,102 @@
+import threading
+import pytest
+from app.tools.rag import dedup
+from app.tools.rag.dedup import NearDuplicateIndex, simhash
+
+FOOTER = (
+    "This document is confidential and proprietary to Acme Corporation. It may not be copied, "
+    "distributed or disclosed to third parties without prior written consent from the legal "
+    "department. All rights reserved. Printed copies are uncontrolled and must be checked against "
+    "the current revision before use in any production environment or customer facing deliverable."
+)
+UNRELATED = (
+    "To configure the vector store, set the Qdrant URL and API key in the environment file, then "
+    "create a collection for each documentation set and upload the chunked PDF pages with the "
+    "ingestion tool so the agent can search them when answering questions about your project."
+)
+
+
+def test_simhash_is_stable_for_whitespace_and_case():
+    assert simhash(FOOTER) == simhash("  " + FOOTER.upper().replace(" ", "\n  "))
+
+
+def test_index_finds_near_duplicate_with_one_word_changed():
+    index = NearDuplicateIndex()
+    index.add("footer", simhash(FOOTER))
+
+    assert index.find(simhash(FOOTER.replace("legal", "compliance"))) == "footer"
+    assert index.find(simhash(UNRELATED)) is None
+
+
+def test_remove_rolls_back_a_reserved_signature():
+    index = NearDuplicateIndex()
+    index.add("footer", simhash(FOOTER), duplicates=2)
+    index.remove("footer")
+
+    assert index.find(simhash(FOOTER)) is None
+    assert "footer" not in index.duplicates
+
+
+class _FailingClient:
+    def collection_exists(self, name):
+        return True
+
+    def scroll(self, **kwargs):
+        raise ConnectionError("qdrant unavailable")
+
+
+class _MissingClient:
+    def collection_exists(self, name):
+        return False
+
+
+def test_failed_load_is_not_cached(monkeypatch):
+    monkeypatch.setattr(dedup, "qdrant_client", _FailingClient())
+    monkeypatch.setattr(dedup, "_indexes", {})
+
+    with pytest.raises(ConnectionError):
+        dedup.get_index("docs")
+    assert "docs" not in dedup._indexes
+
+
+def test_missing_collection_loads_empty_index(monkeypatch):
+    monkeypatch.setattr(dedup, "qdrant_client", _MissingClient())
+    monkeypatch.setattr(dedup, "_indexes", {})
+
+    index = dedup.get_index("docs")
+    assert index.signatures == {}
+    assert dedup._indexes["docs"] is index
+
+
+def _claim_in_thread(index, point_id, signature):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("match", index.claim(point_id, signature, set())))
+    thread.start()
+    return thread, result
+
+
+@pytest.mark.parametrize("persisted, expected", [(True, "a"), (False, None)])
+def test_concurrent_claim_waits_for_pending_reservation(persisted, expected):
+    index = NearDuplicateIndex()
+    signature = simhash(FOOTER)
+    assert index.claim("a", signature, {"a"}) is None
+
+    thread, result = _claim_in_thread(index, "b", signature)
+    thread.join(timeout=0.1)
+    assert thread.is_alive()  # blocked on the unpersisted reservation
+
+    index.release({"a"}, persisted=persisted)
+    thread.join(timeout=1)
+    assert result["match"] == expected
+    assert ("b" in index.signatures) is (expected is None)
+
+
+def test_claim_matches_own_pending_points_and_counts_merges():
+    index = NearDuplicateIndex()
+    signature = simhash(FOOTER)
+    owned = set()
+    assert index.claim("a", signature, owned) is None
+    owned.add("a")
+
+    assert index.claim("b", signature, owned, merge=True) == "a"
+    assert index.duplicates["a"] == 1
@@ -0,0 +1,108 @@
+import json
+import time
+import httpx
+import pytest
+from app.config.gateway import Deployment, GatewayTransport, parse_deployments
+
+PATH = "/openai/deployments/gpt-4o-mini/chat/completions?api-version=2024-06-01"
+
+
+def _client(handler, deployments, **kwargs):
+    transport = GatewayTransport(deployments, transport=httpx.MockTransport(handler), **kwargs)
+    return httpx.Client(transport=transport), transport
+
+
+def _deployments():
+    # Weight 0 on the second deployment makes the first one the primary.
+    return [
+        Deployment(endpoint="https://primary.example.com", deployment="primary", api_key="key-a", weight=1),
+        Deployment(endpoint="https://backup.example.com", deployment="backup", api_key="key-b", weight=0),
+    ]
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_fails_over_and_cools_down_unhealthy_deployment(status):
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.host, request.url.path, request.headers["api-key"]))
+        if request.url.host == "primary.example.com":
+            return httpx.Response(status, json={"error": "busy"})
+        return httpx.Response(200, json={"ok": True})
+
+    deployments = _deployments()
+    client, _ = _client(handler, deployments)
+
+    response = client.post("https://primary.example.com" + PATH, json={})
+    assert response.status_code == 200
+    assert seen[1] == ("backup.example.com", "/openai/deployments/backup/chat/completions", "key-b")
+    assert deployments[0].failures == 1
+    assert not deployments[0].healthy
+
+    client.post("https://primary.example.com" + PATH, json={})
+    assert [host for host, _, _ in seen] == ["primary.example.com", "backup.example.com", "backup.example.com"]
+
+
+def test_returns_last_error_response_when_every_deployment_fails():
+    client, _ = _client(lambda request: httpx.Response(500), _deployments())
+
+    assert client.post("https://primary.example.com" + PATH, json={}).status_code == 500
+
+
+def test_hedges_after_latency_percentile():
+    def handler(request):
+        if request.url.host == "primary.example.com":
+            time.sleep(0.5)
+            return httpx.Response(200, json={"from": "primary"})
+        return httpx.Response(200, json={"from": "backup"})
+
+    client, transport = _client(handler, _deployments(), hedge_percentile=0.9, hedge_min_samples=5)
+    transport._latencies.extend([0.01] * 10)
+
+    start = time.monotonic()
+    response = client.post("https://primary.example.com" + PATH, json={})
+    assert response.json() == {"from": "backup"}
+    assert time.monotonic() - start < 0.4
+
+
+def test_streaming_requests_are_not_hedged_or_buffered():
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        return httpx.Response(200, stream=httpx.ByteStream(b"data: {}\n\n"))
+
+    client, transport = _client(handler, _deployments(), hedge_percentile=0.0, hedge_min_samples=1)
+    transport._latencies.append(10.0)
+
+    with client.stream("POST", "https://primary.example.com" + PATH, json={"stream": True}) as response:
+        assert not response.is_stream_consumed
+        assert response.read() == b"data: {}\n\n"
+    assert hosts == ["primary.example.com"]
+
+
+def test_parse_deployments_rejects_zero_total_weight():
+    raw = json.dumps([{"endpoint": "https://a", "deployment": "a", "api_key": "k", "weight": 0}])
+
+    with pytest.raises(ValueError):
+        parse_deployments(raw, endpoint="https://default", deployment="d", api_key="k")
+
+
+def test_parse_deployments_falls_back_to_single_deployment():
+    deployments = parse_deployments(None, endpoint="https://default", deployment="d", api_key="k")
+
+    assert [(d.endpoint, d.deployment, d.weight) for d in deployments] == [("https://default", "d", 1.0)]
+
+
+def test_rewrite_keeps_the_target_endpoint_base_path():
+    seen = []
+
+    def handler(request):
+        seen.append(str(request.url))
+        return httpx.Response(200, json={})
+
+    deployments = [Deployment(endpoint="https://apim.example.com/aoai/", deployment="eu-gpt", api_key="k")]
+    client, _ = _client(handler, deployments)
+
+    client.post("https://primary.example.com/base" + PATH, json={})
+    assert seen == ["https://apim.example.com/aoai/openai/deployments/eu-gpt/chat/completions?api-version=2024-06-01"]
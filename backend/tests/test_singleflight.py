@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.core.singleflight import CoalescedCallError, SingleFlight, normalize, singleflight_stats
+
+
+def _hold_until_all_entered(flight, callers):
+    """Block the leader until every caller has entered `do()` and is waiting on it."""
+    deadline = time.monotonic() + 5
+    while flight.stats()["calls"] < callers:
+        assert time.monotonic() < deadline, "callers never joined the flight"
+        time.sleep(0.001)
+
+
+def _run_concurrently(flight, fn, callers=8):
+    def call(_):
+        try:
+            return flight.do("key", fn)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        return list(pool.map(call, range(callers)))
+
+
+def test_concurrent_callers_share_one_result():
+    flight = SingleFlight("test_shared_result")
+    calls = []
+
+    def fn():
+        calls.append(threading.get_ident())
+        _hold_until_all_entered(flight, 8)
+        return [0.1, 0.2]
+
+    results = _run_concurrently(flight, fn)
+
+    assert len(calls) == 1
+    assert all(result == [0.1, 0.2] for result in results)
+    stats = singleflight_stats()["test_shared_result"]
+    assert stats["calls"] == 8
+    assert stats["coalesced"] == 7
+    assert stats["coalescing_ratio"] == 0.875
+    assert stats["in_flight"] == 0
+
+
+def test_waiters_get_fresh_errors_chained_to_the_original():
+    flight = SingleFlight("test_shared_error")
+    error = RuntimeError("upstream down")
+
+    def fn():
+        _hold_until_all_entered(flight, 4)
+        raise error
+
+    results = _run_concurrently(flight, fn, callers=4)
+
+    assert sum(result is error for result in results) == 1
+    waiters = [result for result in results if result is not error]
+    assert len(waiters) == 3
+    assert all(isinstance(w, CoalescedCallError) and w.__cause__ is error for w in waiters)
+    assert len({id(w) for w in waiters}) == 3
+
+
+def test_nothing_is_cached_after_the_call_finishes():
+    flight = SingleFlight("test_no_cache")
+    counter = iter(range(10))
+
+    assert flight.do("key", lambda: next(counter)) == 0
+    assert flight.do("key", lambda: next(counter)) == 1
+
+
+def test_normalize_collapses_whitespace_but_keeps_case():
+    assert normalize("  how do I\n deploy   US  ") == "how do I deploy US"
+    assert normalize("US") != normalize("us")
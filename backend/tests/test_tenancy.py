@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+from uuid import NAMESPACE_URL, uuid5
+from qdrant_client import models
+from app.tools.rag import tenancy
+
+
+class _FakeQdrant:
+    """In-memory stand-in for the Qdrant calls the tenancy layer makes."""
+
+    def __init__(self, collections=None):
+        self.collections = {name: dict(points) for name, points in (collections or {}).items()}
+        self.created = {}
+        self.payload_indexes = []
+        self.calls = []
+
+    def collection_exists(self, name):
+        self.calls.append(("collection_exists", name))
+        return name in self.collections
+
+    def create_collection(self, collection_name, **kwargs):
+        self.created[collection_name] = kwargs
+        self.collections[collection_name] = {}
+
+    def create_payload_index(self, collection_name, field_name, field_schema):
+        self.payload_indexes.append((collection_name, field_name, field_schema))
+
+    def upsert(self, collection_name, points):
+        for point in points:
+            self.collections[collection_name][point.id] = point
+
+    def retrieve(self, collection_name, ids, with_payload):
+        self.calls.append(("retrieve", collection_name))
+        points = self.collections.get(collection_name, {})
+        return [SimpleNamespace(id=i, payload=points[i].payload) for i in ids if i in points]
+
+    def scroll(self, collection_name, limit, offset, **kwargs):
+        points = list(self.collections[collection_name].values())
+        start = offset or 0
+        end = start + limit
+        return points[start:end], end if end < len(points) else None
+
+
+def _multitenant(monkeypatch, client=None, shards=4):
+    client = client or _FakeQdrant()
+    monkeypatch.setattr(tenancy, "QDRANT_MULTITENANT", True)
+    monkeypatch.setattr(tenancy, "QDRANT_PHYSICAL_COLLECTIONS", shards)
+    monkeypatch.setattr(tenancy, "_resolved", {})
+    monkeypatch.setattr(tenancy, "_unregistered", {})
+    monkeypatch.setattr(tenancy, "_registered", set())
+    monkeypatch.setattr(tenancy, "_ensured_physical", set())
+    monkeypatch.setattr(tenancy, "qdrant_client", client)
+    return client
+
+
+def _registry_point(name, physical):
+    return models.PointStruct(id=tenancy._registry_id(name), vector=[0.0], payload={"name": name, "physical": physical})
+
+
+def test_single_tenant_mode_is_passthrough(monkeypatch):
+    monkeypatch.setattr(tenancy, "QDRANT_MULTITENANT", False)
+
+    assert tenancy.physical_collection("team_docs") == "team_docs"
+    assert tenancy.tenant_filter("team_docs") is None
+    assert tenancy.tenant_payload("team_docs") == {}
+
+
+def test_multitenant_mode_hashes_new_collections(monkeypatch):
+    _multitenant(monkeypatch)
+
+    physical = tenancy.physical_collection("team_docs")
+    assert physical.startswith(f"{tenancy.QDRANT_PHYSICAL_PREFIX}_")
+    assert physical == tenancy.physical_collection("team_docs")
+    assert tenancy.tenant_payload("team_docs") == {tenancy.TENANT_KEY: "team_docs"}
+
+    condition = tenancy.tenant_filter("team_docs").must[0]
+    assert condition.key == tenancy.TENANT_KEY
+    assert condition.match.value == "team_docs"
+
+
+def test_registry_misses_are_cached(monkeypatch):
+    client = _multitenant(monkeypatch)
+
+    for _ in range(3):
+        tenancy.physical_collection("team_docs")
+    assert client.calls == [("collection_exists", tenancy.REGISTRY_COLLECTION)]
+
+
+def test_registered_collection_keeps_its_shard(monkeypatch):
+    registry = {tenancy.REGISTRY_COLLECTION: {tenancy._registry_id("team_docs"): _registry_point("team_docs", "docs_7")}}
+    _multitenant(monkeypatch, _FakeQdrant(registry), shards=2)
+
+    assert tenancy.physical_collection("team_docs") == "docs_7"
+
+
+def test_ensure_collection_creates_tenant_indexed_shard_and_registers(monkeypatch):
+    client = _multitenant(monkeypatch)
+
+    tenancy.ensure_collection("team_docs")
+    physical = tenancy.physical_collection("team_docs")
+
+    assert client.created[physical]["hnsw_config"].m == 0
+    [(index_collection, field, schema)] = client.payload_indexes
+    assert (index_collection, field) == (physical, tenancy.TENANT_KEY)
+    assert schema.is_tenant is True
+
+    record = client.collections[tenancy.REGISTRY_COLLECTION][tenancy._registry_id("team_docs")]
+    assert record.payload == {"name": "team_docs", "physical": physical}
+
+
+def test_list_collections_pages_through_registry(monkeypatch):
+    names = [f"team_{i:03d}" for i in range(600)]
+    registry = {tenancy._registry_id(n): _registry_point(n, "docs_0") for n in reversed(names)}
+    _multitenant(monkeypatch, _FakeQdrant({tenancy.REGISTRY_COLLECTION: registry}))
+
+    assert tenancy.list_collections() == names
+
+
+def test_list_collections_without_registry_is_empty(monkeypatch):
+    _multitenant(monkeypatch)
+
+    assert tenancy.list_collections() == []
+
+
+def test_migrate_collection_tags_points_with_stable_ids(monkeypatch):
+    source = {
+        i: SimpleNamespace(id=i, vector=[0.1, 0.2], payload={"text": f"chunk {i}"})
+        for i in range(300)
+    }
+    client = _multitenant(monkeypatch, _FakeQdrant({"team_docs": source}))
+
+    assert tenancy.migrate_collection("team_docs", batch_size=128) == 300
+    assert tenancy.migrate_collection("team_docs", batch_size=128) == 300  # re-run overwrites
+
+    physical = tenancy.physical_collection("team_docs")
+    copied = client.collections[physical]
+    assert len(copied) == 300
+    point = copied[str(uuid5(NAMESPACE_URL, "team_docs/7"))]
+    assert point.vector == [0.1, 0.2]
+    assert point.payload == {"text": "chunk 7", tenancy.TENANT_KEY: "team_docs"}
+    assert "team_docs" in client.collections  # source is left in place